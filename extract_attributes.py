@@ -2,163 +2,466 @@
 Extract attributes from various file types (shapefiles, CSV, etc.) with sample data.
 Extensible design for adding new file type handlers.
 """
+import io
 import os
-import sys
+import re
 import csv
+import codecs
 import argparse
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Any
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 
+logger = logging.getLogger(__name__)
+
+try:
+    import pyogrio
+    HAS_PYOGRIO = True
+except ImportError:
+    HAS_PYOGRIO = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# Number of records scanned per file when looking for a complete sample row
+MAX_ROWS_TO_CHECK = 10000
+
+# Records checked with csv.reader before a CSV or TXT file is handed to pyarrow
+PROBE_ROWS = 100
+
+# Raise the csv module's 128 KB field limit, but keep it bounded: a quote that is
+# never closed makes csv.reader pull the rest of the file into one field
+csv.field_size_limit(16 * 1024 * 1024)
+
+
+def _find_best_row(df: pd.DataFrame, first_window: int = 1) -> Tuple[int, int]:
+    """
+    Pick the sample row: the first row with no nulls, else the most complete one.
+    
+    The null mask is built over growing windows (the first row alone, then 10x
+    larger each time) so when the first row is complete, which is the usual case,
+    only that row is examined, and a later complete row is still found early.
+    
+    Returns:
+        Tuple of (row_index, non_null_count); (0, -1) for an empty frame
+    """
+    best_idx, best_count = 0, -1
+    start, window = 0, first_window
+    while start < len(df):
+        stop = min(start + window, len(df))
+        idx, count = _best_in_mask(df.iloc[start:stop].notna().to_numpy())
+        if count == df.shape[1]:
+            return start + idx, count
+        
+        # Track best row (most complete, earliest on ties)
+        if count > best_count:
+            best_idx, best_count = start + idx, count
+        
+        start, window = stop, window * 10
+    
+    return best_idx, best_count
+
+
+def _best_in_mask(not_null: np.ndarray) -> Tuple[int, int]:
+    """Return (row_index, non_null_count) of the first complete, else most complete, row."""
+    complete = not_null.all(axis=1)
+    if complete.any():
+        return int(complete.argmax()), not_null.shape[1]
+    
+    counts = not_null.sum(axis=1)
+    best_idx = int(counts.argmax())
+    return best_idx, int(counts[best_idx])
+
+
+class _IgnoreInvalidUtf8(io.RawIOBase):
+    """
+    Binary stream that drops bytes which are not valid UTF-8.
+    
+    Matches the errors='ignore' decoding of _scan_lines. Arrow would otherwise
+    reject such text, and it fails to decode a malformed row for its
+    invalid_row_handler, printing an ignored UnicodeDecodeError to stderr.
+    """
+    
+    def __init__(self, raw):
+        self._raw = raw
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        # A chunk may decode to nothing (all invalid, or a split character);
+        # keep reading so an empty result only ever means end of file
+        while True:
+            data = self._raw.read(size)
+            if data.isascii() and not self._decoder.getstate()[0]:
+                return data  # Already valid, and no split character is pending
+            text = self._decoder.decode(data, final=not data)
+            if text or not data:
+                return text.encode('utf-8')
+
+
+def _scan_with_arrow(file_path: Path, delimiter: str) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
+    """
+    Find the sample row of a delimited text file with pyarrow's streaming CSV reader.
+    
+    Gives the same result as _scan_lines: every column is read as text, empty or
+    whitespace-only values count as missing, and the first MAX_ROWS_TO_CHECK
+    records are examined, including blank and wrong-length ones, which are skipped.
+    Where Arrow cannot tell that apart, the file is left to _scan_lines.
+    """
+    with open(file_path, 'rb') as f:
+        # The header is parsed by csv.reader; counting the bytes of the lines it
+        # consumes lets Arrow start exactly after it, even if a quoted name spans lines
+        header_bytes = 0
+        
+        def header_lines():
+            nonlocal header_bytes
+            for raw in f:
+                header_bytes += len(raw)
+                yield raw.decode('utf-8', errors='ignore')
+        
+        header = next(csv.reader(header_lines(), delimiter=delimiter), None)
+        if not header:
+            return None
+        
+        attributes = [col.strip() for col in header]
+        n_cols = len(attributes)
+        
+        # Rows with the wrong column count still use up the row budget, as in
+        # _scan_lines, so they are counted as they are skipped
+        skipped = 0
+        
+        def skip_invalid(row):
+            nonlocal skipped
+            skipped += 1
+            return 'skip'
+        
+        # Positional column names sidestep duplicate or blank header names.
+        # Blank lines are kept as (all-empty) rows so they are counted too.
+        f.seek(header_bytes)
+        names = [str(i) for i in range(n_cols)]
+        reader = pacsv.open_csv(
+            _IgnoreInvalidUtf8(f),
+            read_options=pacsv.ReadOptions(column_names=names, block_size=1 << 20),
+            parse_options=pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True,
+                                             ignore_empty_lines=False, invalid_row_handler=skip_invalid),
+            convert_options=pacsv.ConvertOptions(column_types=dict.fromkeys(names, pa.string())),
+        )
+        
+        # A row with no populated value (e.g. a blank line) is never a sample
+        best_row = None
+        best_count = 0
+        rows_read = 0
+        
+        for batch in reader:
+            if skipped:
+                if rows_read + batch.num_rows + skipped > MAX_ROWS_TO_CHECK:
+                    # The limit falls inside this batch, but where its skipped rows sat is unknown
+                    return _scan_lines(file_path, delimiter)
+            elif rows_read >= MAX_ROWS_TO_CHECK:
+                break
+            else:
+                batch = batch.slice(0, MAX_ROWS_TO_CHECK - rows_read)
+            rows_read += batch.num_rows
+            if batch.num_rows == 0:
+                continue
+            
+            # Non-empty test runs per column in Arrow compute kernels
+            not_null = np.column_stack([
+                pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(col)), 0).to_numpy(zero_copy_only=False)
+                for col in batch.columns
+            ])
+            idx, count = _best_in_mask(not_null)
+            
+            if count > best_count:
+                best_count = count
+                best_row = [col[idx].as_py().strip() for col in batch.columns]
+                if count == n_cols:
+                    break
+    
+    logger.debug(f"    ✓ Checked {rows_read + skipped} rows")
+    
+    if best_row is None:
+        return None
+    return attributes, dict(zip(attributes, best_row)), best_count
+
+
+def _scan_delimited(file_path: Path, delimiter: str) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
+    """
+    Find the sample row of a delimited text file.
+    
+    The first PROBE_ROWS records are checked with csv.reader, which stops at the
+    first complete row, so a file whose first row is complete costs one line.
+    The Arrow reader parses a whole block and reads ahead before it can stop,
+    so it is only opened when the probe finds no complete row and the file
+    goes on past it.
+    """
+    if HAS_PYARROW:
+        try:
+            result, final = _scan_rows(file_path, delimiter, PROBE_ROWS)
+            if final:
+                return result
+            return _scan_with_arrow(file_path, delimiter)
+        except (pa.ArrowInvalid, csv.Error) as e:
+            logger.debug(f"    ↩ Fast scan failed ({e}), using line parser")
+    
+    return _scan_lines(file_path, delimiter)
+
+
+def _scan_lines(file_path: Path, delimiter: str) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
+    """
+    Fallback scan with the csv module, used when pyarrow is missing or cannot parse the file.
+    
+    Quoted fields may contain the delimiter; values are stripped and empty ones
+    count as missing, as in _scan_with_arrow.
+    """
+    return _scan_rows(file_path, delimiter, MAX_ROWS_TO_CHECK)[0]
+
+
+def _scan_rows(file_path: Path, delimiter: str,
+               max_rows: int) -> Tuple[Optional[Tuple[List[str], Dict[str, Any], int]], bool]:
+    """
+    Scan up to max_rows records with csv.reader.
+    
+    Returns:
+        Tuple of (result, final); final is True when reading further could not
+        change the result: a complete row was found or the file ended first
+    """
+    rows_checked = 0
+    
+    # A row with no populated value is never a sample
+    best_row = None
+    best_count = 0
+    
+    with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        
+        # Get headers from first line
+        header = next(reader, None)
+        if not header:
+            return None, True
+        attributes = [col.strip() for col in header]
+        n_cols = len(attributes)
+        
+        # Process rows; islice stops after max_rows records
+        try:
+            for rows_checked, row in enumerate(itertools.islice(reader, max_rows), 1):
+                # Skip blank lines and rows with wrong column count
+                if len(row) != n_cols:
+                    continue
+                
+                row = [val.strip() for val in row]
+                
+                # Count non-empty values
+                non_null_count = sum(1 for val in row if val)
+                
+                # Perfect row found
+                if non_null_count == n_cols:
+                    logger.debug(f"    ✓ Checked {rows_checked} rows")
+                    return (attributes, dict(zip(attributes, row)), non_null_count), True
+                
+                # Track best row
+                if non_null_count > best_count:
+                    best_count = non_null_count
+                    best_row = row
+            final = rows_checked < max_rows
+        except csv.Error as e:
+            # Malformed record (e.g. an unclosed quote hitting the field limit);
+            # the rows read before it still give a sample
+            logger.debug(f"    ⚠️  Stopped at malformed record ({e})")
+            final = False
+    
+    if final or max_rows == MAX_ROWS_TO_CHECK:
+        logger.debug(f"    ✓ Checked {rows_checked} rows")
+    
+    if best_row is None:
+        return None, final
+    return (attributes, dict(zip(attributes, best_row)), best_count), final
+
+
+def _init_worker_logging(level: int):
+    """
+    Pool initializer: repeat main()'s logging setup in a worker process.
+    
+    Spawned workers (the default on Windows and macOS) start with a fresh
+    logging module, so the parent's level would otherwise be lost there.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger.setLevel(level)
+
+
+def _folds_case(folder: Path) -> bool:
+    """
+    Check whether folder's filesystem matches names case-insensitively.
+    
+    True on NTFS and on default (APFS) macOS volumes, where 'Data_attributes.txt'
+    and 'data_attributes.txt' are the same file. Probed by looking up the nearest
+    path component that has letters with its case swapped, so nothing is written.
+    """
+    path = folder.resolve()
+    for part in (path, *path.parents):
+        if part.name != part.name.swapcase():
+            try:
+                return os.path.samefile(part, part.with_name(part.name.swapcase()))
+            except OSError:
+                return False  # No such entry: names are case-sensitive here
+    return os.path.normcase('A') == 'a'  # No letters in the path: assume the platform default
+
+
+def _iter_files(root_folder: Path) -> Iterator[os.DirEntry]:
+    """
+    Yield every file below root_folder using os.scandir.
+    
+    DirEntry carries the file type from the directory listing itself, so no extra
+    stat call is needed per entry (unlike Path.rglob + is_file).
+    """
+    stack = [str(root_folder)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError:
+            continue  # Unreadable folder
+
 
 class FileHandler(ABC):
     """Abstract base class for file type handlers."""
     
     @abstractmethod
+    def supported_extensions(self) -> FrozenSet[str]:
+        """Return the lowercase file extensions (e.g. '.shp') this handler processes."""
+        pass
+    
     def can_handle(self, file_path: Path) -> bool:
         """Check if this handler can process the given file."""
-        pass
+        return file_path.suffix.lower() in self.supported_extensions()
     
     @abstractmethod
-    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
         """
         Extract attributes and sample data from file.
         
         Returns:
-            Tuple of (attribute_names, sample_data_dict) or None if no valid sample found
+            Tuple of (attribute_names, sample_data_dict, non_null_count) or None if no
+            valid sample found; non_null_count is the number of populated fields in
+            the sample row
         """
         pass
+    
+    def output_filename(self, file_path: Path) -> str:
+        """Name of the output file written for file_path."""
+        return f"{file_path.stem}_attributes.txt"
 
 
 class ShapefileHandler(FileHandler):
     """Handler for shapefile extraction."""
     
-    def can_handle(self, file_path: Path) -> bool:
-        return file_path.suffix.lower() == '.shp'
+    _EXTENSIONS = frozenset({'.shp'})
     
-    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+    def supported_extensions(self) -> FrozenSet[str]:
+        return self._EXTENSIONS
+    
+    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
         try:
-            gdf = gpd.read_file(file_path)
-            
-            if gdf.empty:
-                return None
-            
-            # Limit to first 10,000 records
-            gdf_sample = gdf.head(10000)
-            
-            # Get column names (attributes)
-            attributes = list(gdf_sample.columns)
-            
-            best_row = None
-            best_count = -1
-            
-            # Find first row where all attributes have data (no nulls)
-            # Or track the row with most non-null values
-            for idx, row in gdf_sample.iterrows():
-                null_count = row.isnull().sum()
-                non_null_count = len(row) - null_count
-                
-                if null_count == 0:
-                    # Found perfect row with all data
-                    sample_data = row.to_dict()
-                    if 'geometry' in sample_data:
-                        sample_data['geometry'] = str(sample_data['geometry'])
-                    return attributes, sample_data
-                
-                # Track best row (most complete)
-                if non_null_count > best_count:
-                    best_count = non_null_count
-                    best_row = row
-            
-            # Use the best row found (most complete data)
-            if best_row is not None:
-                sample_data = best_row.to_dict()
-                if 'geometry' in sample_data:
-                    sample_data['geometry'] = str(sample_data['geometry'])
-                return attributes, sample_data
-            
-            return None
+            if HAS_PYOGRIO:
+                return self._extract_with_pyogrio(file_path)
+            return self._extract_with_fiona(file_path)
             
         except Exception as e:
-            print(f"Error reading shapefile {file_path}: {e}")
+            logger.warning(f"    ⚠️  Error reading shapefile {file_path}: {e}")
             return None
+    
+    def _extract_with_pyogrio(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
+        """Scan attributes without decoding geometries, then fetch only the chosen one."""
+        # Only the first 10,000 records are read, and only their attribute columns.
+        # The default (non-Arrow) conversion is the one gpd.read_file uses, so nulls
+        # and integer fields with nulls come out with the same dtypes, and print the
+        # same, as before.
+        # Bounds are NaN for null geometries, so the minx bound stands in for the
+        # geometry column in the null scan without building any shapely objects.
+        # They also give the feature count when the layer has no attribute fields.
+        fids, bounds = pyogrio.read_bounds(file_path, max_features=MAX_ROWS_TO_CHECK)
+        
+        # Nothing to sample; also skips the attribute read below
+        if len(fids) == 0:
+            return None
+        
+        df = pyogrio.read_dataframe(file_path, read_geometry=False, max_features=len(fids))
+        if len(df) == 0:
+            # Geometry-only layer (e.g. no .dbf): the attribute read comes back empty
+            df = pd.DataFrame(index=range(len(fids)))
+        df['geometry'] = bounds[0]
+        
+        attributes = list(df.columns)
+        best_idx, best_count = _find_best_row(df)
+        
+        # Take values straight from each column rather than building a row Series
+        sample_data = {col: df[col].iat[best_idx] for col in df.columns}
+        sample_data['geometry'] = None
+        if not np.isnan(bounds[0][best_idx]):
+            row = pyogrio.read_dataframe(file_path, columns=[], skip_features=best_idx, max_features=1)
+            sample_data['geometry'] = row.geometry.iat[0].wkt
+        return attributes, sample_data, best_count
+    
+    def _extract_with_fiona(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
+        """Fallback when pyogrio is not installed: read the first records with geometries."""
+        gdf = gpd.read_file(file_path, engine='fiona', rows=MAX_ROWS_TO_CHECK)
+        
+        # Get column names (attributes)
+        attributes = list(gdf.columns)
+        
+        # Find first row where all attributes have data (no nulls),
+        # or the row with most non-null values; an empty layer has no best row
+        best_idx, best_count = _find_best_row(gdf)
+        if best_count < 0:
+            return None
+        
+        # Take values straight from each column rather than building a row Series
+        sample_data = {col: gdf[col].iat[best_idx] for col in gdf.columns}
+        if 'geometry' in sample_data:
+            geometry = sample_data['geometry']
+            sample_data['geometry'] = geometry.wkt if geometry is not None else None
+        return attributes, sample_data, best_count
 
 
 class CSVHandler(FileHandler):
     """Handler for CSV file extraction."""
     
-    def can_handle(self, file_path: Path) -> bool:
-        return file_path.suffix.lower() == '.csv'
+    _EXTENSIONS = frozenset({'.csv'})
+    
+    def supported_extensions(self) -> FrozenSet[str]:
+        return self._EXTENSIONS
     
-    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
         try:
-            file_size = file_path.stat().st_size
-            print(f"    💾 File size: {file_size / (1024**3):.2f} GB")
+            # The size is only reported in verbose mode, so only stat the file then
+            if logger.isEnabledFor(logging.DEBUG):
+                file_size = file_path.stat().st_size
+                logger.debug(f"    💾 File size: {file_size / (1024**3):.2f} GB")
             
-            max_rows_to_check = 10000
-            rows_checked = 0
-            
-            best_row = None
-            best_count = -1
-            attributes = None
-            
-            # Read as text and manually parse to avoid field size limits
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                # Get headers from first line
-                header_line = f.readline().strip()
-                if not header_line:
-                    return None
-                
-                # Split on comma (simple split for CSV)
-                attributes = [col.strip('"').strip() for col in header_line.split(',')]
-                
-                # Process rows
-                for line in f:
-                    rows_checked += 1
-                    line = line.strip()
-                    
-                    if not line:
-                        continue
-                    
-                    # Simple split - this avoids csv field size limits
-                    row = [val.strip('"').strip() for val in line.split(',')]
-                    
-                    # Skip rows with wrong column count
-                    if len(row) != len(attributes):
-                        continue
-                    
-                    # Count non-empty values
-                    non_null_count = sum(1 for val in row if val)
-                    
-                    # Perfect row found
-                    if non_null_count == len(attributes):
-                        row_dict = {attributes[i]: row[i] for i in range(len(attributes))}
-                        return attributes, row_dict
-                    
-                    # Track best row
-                    if non_null_count > best_count:
-                        best_count = non_null_count
-                        best_row = row
-                    
-                    # Progress indicator
-                    if rows_checked % 5000 == 0:
-                        print(f"    🔍 Checked {rows_checked} rows...", end='\r')
-                    
-                    # Stop after checking enough rows
-                    if rows_checked >= max_rows_to_check:
-                        print(f"    ✓ Checked {rows_checked} rows" + " " * 20)
-                        break
-            
-            if best_row is not None:
-                row_dict = {attributes[i]: best_row[i] if i < len(best_row) else '' for i in range(len(attributes))}
-                return attributes, row_dict
-            
-            return None
+            return _scan_delimited(file_path, ',')
             
         except Exception as e:
-            print(f"    ⚠️  Error reading CSV: {e}")
+            logger.warning(f"    ⚠️  Error reading CSV {file_path}: {e}")
             return None
 
 
@@ -168,110 +471,99 @@ class CSVHandler(FileHandler):
 class TXTHandler(FileHandler):
     """Handler for TXT files that contain CSV-like data."""
     
-    def can_handle(self, file_path: Path) -> bool:
-        return file_path.suffix.lower() == '.txt'
+    _EXTENSIONS = frozenset({'.txt'})
+    
+    def supported_extensions(self) -> FrozenSet[str]:
+        return self._EXTENSIONS
     
-    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+    def extract_data(self, file_path: Path) -> Optional[Tuple[List[str], Dict[str, Any], int]]:
         try:
-            file_size = file_path.stat().st_size
-            print(f"    💾 File size: {file_size / (1024**3):.2f} GB")
+            # The size is only reported in verbose mode, so only stat the file then
+            if logger.isEnabledFor(logging.DEBUG):
+                file_size = file_path.stat().st_size
+                logger.debug(f"    💾 File size: {file_size / (1024**3):.2f} GB")
             
             # Detect delimiter
             delimiter = self._detect_delimiter(file_path)
-            print(f"    🔍 Detected delimiter: 'tab'" if delimiter == '\t' else f"    🔍 Detected delimiter: '{delimiter}'")
-            
-            max_rows_to_check = 10000
-            rows_checked = 0
-            
-            best_row = None
-            best_count = -1
-            attributes = None
-            
-            # Read as text and manually parse to avoid field size limits
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                # Get headers from first line
-                header_line = f.readline().strip()
-                if not header_line:
-                    return None
-                
-                # Split on detected delimiter
-                attributes = [col.strip('"').strip() for col in header_line.split(delimiter)]
-                
-                # Process rows
-                for line in f:
-                    rows_checked += 1
-                    line = line.strip()
-                    
-                    if not line:
-                        continue
-                    
-                    # Simple split - this avoids csv field size limits
-                    row = [val.strip('"').strip() for val in line.split(delimiter)]
-                    
-                    # Skip rows with wrong column count
-                    if len(row) != len(attributes):
-                        continue
-                    
-                    # Count non-empty values
-                    non_null_count = sum(1 for val in row if val)
-                    
-                    # Perfect row found
-                    if non_null_count == len(attributes):
-                        row_dict = {attributes[i]: row[i] for i in range(len(attributes))}
-                        return attributes, row_dict
-                    
-                    # Track best row
-                    if non_null_count > best_count:
-                        best_count = non_null_count
-                        best_row = row
-                    
-                    # Progress indicator
-                    if rows_checked % 5000 == 0:
-                        print(f"    🔍 Checked {rows_checked} rows...", end='\r')
-                    
-                    # Stop after checking enough rows
-                    if rows_checked >= max_rows_to_check:
-                        print(f"    ✓ Checked {rows_checked} rows" + " " * 20)
-                        break
+            logger.debug(f"    🔍 Detected delimiter: 'tab'" if delimiter == '\t' else f"    🔍 Detected delimiter: '{delimiter}'")
             
-            if best_row is not None:
-                row_dict = {attributes[i]: best_row[i] if i < len(best_row) else '' for i in range(len(attributes))}
-                return attributes, row_dict
-            
-            return None
+            return _scan_delimited(file_path, delimiter)
             
         except Exception as e:
-            print(f"    ⚠️  Error reading TXT file: {e}")
+            logger.warning(f"    ⚠️  Error reading TXT file {file_path}: {e}")
             return None
     
     def _detect_delimiter(self, file_path: Path) -> str:
-        """Detect the delimiter used in the file."""
+        """
+        Detect the delimiter used in the file.
+        
+        Prefers a delimiter that splits the header and the next few lines into the
+        same number of fields, so a comma inside a tab-delimited header does not
+        win; otherwise the most frequent delimiter in the header is used.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                first_line = f.readline()
-                
-                # Count potential delimiters
-                delimiters = [',', '\t', '|', ';']
-                counts = {delim: first_line.count(delim) for delim in delimiters}
-                
-                # Return delimiter with highest count (if > 0)
-                best_delim = max(counts, key=counts.get)
-                if counts[best_delim] > 0:
-                    return best_delim
-                
+            # Delimiters are ASCII, so count them on raw bytes without decoding
+            with open(file_path, 'rb') as f:
+                sample = f.read(1 << 16)
+            lines = sample.splitlines()
+            if len(sample) == 1 << 16 and len(lines) > 1:
+                lines.pop()  # Possibly cut off mid-line
+            lines = [line for line in lines[:10] if line.strip()]
+            if not lines:
                 return ','  # Default to comma
+            
+            # Count potential delimiters
+            delimiters = [',', '\t', '|', ';']
+            counts = {delim: [line.count(delim.encode()) for line in lines] for delim in delimiters}
+            
+            # A delimiter whose count is the same on every sampled line is the
+            # strongest signal; among those, or failing that, take the most frequent
+            consistent = [d for d in delimiters if counts[d][0] > 0 and len(set(counts[d])) == 1]
+            candidates = consistent or delimiters
+            best_delim = max(candidates, key=lambda d: counts[d][0])
+            if counts[best_delim][0] > 0:
+                return best_delim
+            
+            return ','  # Default to comma
         except:
             return ','
 
 
+def _format_output(filename: str, path: Path, handler_name: str, completeness_pct: float,
+                   attributes: List[str], sample_data: Dict[str, Any]) -> str:
+    """Build the full contents of an *_attributes.txt file."""
+    parts = [
+        "[FILE_START]\n",
+        f"Filename: {filename}\n",
+        f"Path: {path}\n",
+        f"Type: {handler_name}\n",
+        f"Completeness: {completeness_pct:.1f}%\n\n",
+        "[ATTRIBUTES_START]\n",
+    ]
+    parts.extend(f"{attr}\n" for attr in attributes)
+    parts.append("[ATTRIBUTES_END]\n\n[SAMPLE_DATA_START]\n")
+    # Use ||| as delimiter for easy parsing
+    parts.extend(f"{attr}|||{sample_data.get(attr, 'N/A')}\n" for attr in attributes)
+    parts.append("[SAMPLE_DATA_END]\n[FILE_END]\n")
+    return ''.join(parts)
+
+
 class AttributeExtractor:
     """Main class for extracting attributes from files."""
     
     def __init__(self, root_folder: str, handlers: List[FileHandler], config_file: Optional[str] = None):
         self.root_folder = Path(root_folder)
         self.handlers = handlers
+        # Extension -> handler lookup; the first handler listed wins on conflicts
+        self._ext_map = {ext: handler for handler in reversed(handlers)
+                         for ext in handler.supported_extensions()}
         self.processed_filenames = set()
         self.attribute_filters = self._load_config(config_file) if config_file else []
+        # All filters as one alternation so each filename is scanned once
+        self._filter_re = (re.compile('|'.join(map(re.escape, self.attribute_filters)))
+                           if self.attribute_filters else None)
+        # find_files results keyed by (root_folder, root mtime); see refresh()
+        self._files_cache: Dict[Tuple[str, int], Dict[str, List[Path]]] = {}
     
     def _load_config(self, config_file: str) -> List[str]:
         """Load filename filters from config file."""
@@ -300,174 +592,234 @@ class AttributeExtractor:
     
     def _matches_filters(self, filename: str) -> bool:
         """Check if filename matches any filter."""
-        if not self.attribute_filters:
+        if self._filter_re is None:
             return True  # No filters = process all
         
         # Check if filename contains any filter text (case-sensitive)
-        for filter_text in self.attribute_filters:
-            if filter_text in filename:
-                return True
-        
-        return False
+        return self._filter_re.search(filename) is not None
+    
+    def refresh(self):
+        """Forget cached scan results so the next find_files walks the tree again."""
+        self._files_cache.clear()
     
     def find_files(self) -> Dict[str, List[Path]]:
-        """Find all supported files in the root folder and subfolders."""
+        """Find all supported files in the root folder and subfolders, sorted by path.
+        
+        Results are cached per instance and reused while the root folder's
+        mtime is unchanged. Changes inside nested folders do not touch that
+        mtime, so call refresh() after modifying the tree in place.
+        """
+        key = (str(self.root_folder), os.stat(self.root_folder).st_mtime_ns)
+        cached = self._files_cache.get(key)
+        if cached is not None:
+            print(f"\n🔍 Reusing previous scan of: {self.root_folder}")
+            return {name: list(paths) for name, paths in cached.items()}
+        
         print(f"\n🔍 Scanning directory: {self.root_folder}")
         
+        extensions = ', '.join(ext for handler in self.handlers for ext in sorted(handler.supported_extensions()))
         if self.attribute_filters:
-            print(f"Searching for .shp, .csv, .txt files matching config filters...")
+            print(f"Searching for {extensions} files matching config filters...")
         else:
-            print("Searching for all .shp, .csv, and .txt files...")
+            print(f"Searching for all {extensions} files...")
         
         files_by_handler = {handler.__class__.__name__: [] for handler in self.handlers}
         
-        # Search for specific extensions only (much faster than checking every file)
-        extensions = ['*.shp', '*.csv', '*.txt']
         total_found = 0
         total_matched = 0
         
-        for ext in extensions:
-            print(f"  Looking for {ext} files...", end='\r')
-            for file_path in self.root_folder.rglob(ext):
-                if file_path.is_file():
-                    total_found += 1
-                    
-                    # Check config filter immediately (if filters exist)
-                    if self.attribute_filters and not self._matches_filters(file_path.name):
-                        continue  # Skip files that don't match config
-                    
-                    total_matched += 1
-                    
-                    # Match with appropriate handler
-                    for handler in self.handlers:
-                        if handler.can_handle(file_path):
-                            files_by_handler[handler.__class__.__name__].append(file_path)
-                            break
+        # Walk the tree once; each entry is matched by a single extension lookup
+        print("  Looking for files...", end='\r')
+        for entry in _iter_files(self.root_folder):
+            handler = self._ext_map.get(os.path.splitext(entry.name)[1].lower())
+            if handler is None:
+                continue
+            
+            total_found += 1
+            
+            # Check config filter immediately (if filters exist)
+            if self.attribute_filters and not self._matches_filters(entry.name):
+                continue  # Skip files that don't match config
+            
+            total_matched += 1
+            files_by_handler[handler.__class__.__name__].append(Path(entry.path))
         
         if self.attribute_filters:
             print(f"  ✓ Scan complete: {total_matched} matched files (from {total_found} total)" + " " * 30)
         else:
             print(f"  ✓ Scan complete: {total_found} files found" + " " * 30)
         
-        return files_by_handler
+        # Sorted here, once per scan, so cached results come back in processing order
+        for paths in files_by_handler.values():
+            paths.sort()
+        
+        self._files_cache[key] = files_by_handler
+        return {name: list(paths) for name, paths in files_by_handler.items()}
     
-    def extract_and_save(self, output_folder: str = "."):
-        """Extract attributes and save to individual text files."""
+    def extract_and_save(self, output_folder: str = ".", workers: Optional[int] = None):
+        """
+        Extract attributes and save to individual text files.
+        
+        Args:
+            output_folder: Folder for the *_attributes.txt files
+            workers: Number of extraction processes (default: CPU count, 1 = no pool)
+        """
         output_path = Path(output_folder)
         output_path.mkdir(exist_ok=True)
         
         files_by_handler = self.find_files()
         
+        # One directory listing instead of an exists() call per file; names are
+        # added as outputs are written so later files see them too. On a
+        # case-insensitive folder, where exists() matched 'Data' and 'data'
+        # alike, names are compared lowercased (str leaves them unchanged).
+        # str.lower is the simple per-character mapping those filesystems use;
+        # casefold would also merge e.g. 'ß' with 'ss'.
+        fold = str.lower if _folds_case(output_path) else str
+        existing_outputs = {fold(name) for name in os.listdir(output_path)}
+        
         # Track overall statistics
         overall_processed = 0
         overall_skipped = 0
         overall_failed = 0
         
-        # Process each handler type separately
-        for handler in self.handlers:
-            handler_name = handler.__class__.__name__
-            file_paths = files_by_handler.get(handler_name, [])
-            
-            if not file_paths:
-                print(f"No files found for {handler_name}")
-                continue
-            
-            total_files = len(file_paths)
-            print(f"\n{'='*80}")
-            print(f"Processing {total_files} files with {handler_name}")
-            print(f"{'='*80}")
-            
-            processed_count = 0
-            skipped_count = 0
-            failed_count = 0
-            
-            for idx, file_path in enumerate(sorted(file_paths), 1):
-                filename = file_path.name
-                
-                # Show progress
-                progress_pct = (idx / total_files) * 100
-                print(f"\n[{idx}/{total_files}] ({progress_pct:.1f}%)")
-                print(f"  File: {filename}")
-                print(f"  Path: {file_path}")
-                
-                # Check if output file already exists
-                file_stem = Path(filename).stem
-                output_file = output_path / f"{file_stem}_attributes.txt"
-                if output_file.exists():
-                    skipped_count += 1
-                    print(f"  ⊘ Status: SKIPPED (output already exists)")
-                    print(f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
-                    continue
-                
-
-                # Skip if filename already processed
-                if filename in self.processed_filenames:
-                    skipped_count += 1
-                    print(f"  ⊘ Status: SKIPPED (duplicate filename)")
-                    print(f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
-                    continue
-                
-                result = handler.extract_data(file_path)
+        # Files are independent, so with more than one worker they are extracted
+        # in a process pool while this process writes results in sorted order.
+        # A single worker (e.g. the default on a 1-CPU machine) runs inline,
+        # since a pool would only add process startup and pickling.
+        workers = workers or os.cpu_count() or 1
+        pool = (ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_logging,
+                                    initargs=(logger.getEffectiveLevel(),))
+                if workers > 1 else nullcontext())
+        with pool as executor:
+            # Process each handler type separately
+            for handler in self.handlers:
+                handler_name = handler.__class__.__name__
+                file_paths = files_by_handler.get(handler_name, [])
                 
-                if result is None:
-                    failed_count += 1
-                    print(f"  ✗ Status: FAILED (no data found)")
-                    print(f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
+                if not file_paths:
+                    print(f"No files found for {handler_name}")
                     continue
                 
-                attributes, sample_data = result
+                total_files = len(file_paths)
+                print(f"\n{'='*80}")
+                print(f"Processing {total_files} files with {handler_name}")
+                print(f"{'='*80}")
                 
-                # Check data completeness
-                null_count = sum(1 for v in sample_data.values() if pd.isna(v))
-                completeness_pct = ((len(attributes) - null_count) / len(attributes)) * 100 if attributes else 0
+                processed_count = 0
+                skipped_count = 0
+                failed_count = 0
                 
-                processed_count += 1
+                # Only the first file of each name, and only when its output does not
+                # exist yet, is sent to the pool; duplicates are reported as skipped below.
+                # find_files returns each list already sorted.
+                futures = {}
+                if executor is not None:
+                    first_by_name = {}
+                    for p in file_paths:
+                        first_by_name.setdefault(p.name, p)
+                    try:
+                        futures = {p: executor.submit(handler.extract_data, p)
+                                   for name, p in first_by_name.items()
+                                   if name not in self.processed_filenames
+                                   and fold(handler.output_filename(p)) not in existing_outputs}
+                    except BrokenProcessPool:
+                        # A worker died after the previous handler was done with the pool
+                        executor, futures = None, {}
                 
-                # Show detailed info in console
-                print(f"  ✓ Status: SUCCESS")
-                print(f"  📋 Attributes: {len(attributes)}")
-                print(f"  📊 Completeness: {completeness_pct:.1f}% ({len(attributes) - null_count}/{len(attributes)} fields)")
-                print(f"  📈 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
-                
-                # Write to individual file (output_file already defined above)
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(f"[FILE_START]\n")
-                    f.write(f"Filename: {filename}\n")
-                    f.write(f"Path: {file_path}\n")
-                    f.write(f"Type: {handler_name}\n")
-                    f.write(f"Completeness: {completeness_pct:.1f}%\n\n")
+                for idx, file_path in enumerate(file_paths, 1):
+                    filename = file_path.name
+                    
+                    # Show progress; each status block below goes out in a single print
+                    # so a run over thousands of files costs one console write per block
+                    progress_pct = (idx / total_files) * 100
+                    print(f"\n[{idx}/{total_files}] ({progress_pct:.1f}%)\n"
+                          f"  File: {filename}\n"
+                          f"  Path: {file_path}")
+                    
+                    # Check if output file already exists
+                    output_name = handler.output_filename(file_path)
+                    output_file = output_path / output_name
+                    if fold(output_name) in existing_outputs:
+                        skipped_count += 1
+                        print(f"  ⊘ Status: SKIPPED (output already exists)\n"
+                              f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
+                        continue
+                    
+
+                    # Skip if filename already processed
+                    if filename in self.processed_filenames:
+                        skipped_count += 1
+                        print(f"  ⊘ Status: SKIPPED (duplicate filename)\n"
+                              f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
+                        continue
+                    
+                    future = futures.pop(file_path, None)
+                    if future is not None:
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            # A worker died (e.g. out of memory or a crash inside GDAL) while this
+                            # file was pending. The pool cannot run anything else, so results that
+                            # already arrived are kept and the rest run in this process.
+                            executor = None
+                            futures = {p: f for p, f in futures.items()
+                                       if f.done() and f.exception() is None}
+                            failed_count += 1
+                            print(f"  ✗ Status: FAILED (worker process terminated)\n"
+                                  f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
+                            continue
+                        except Exception as e:
+                            # Any other pool-side error (e.g. an unpicklable handler or result)
+                            # only affects this file, which is extracted here instead
+                            logger.debug(f"    ↩ Worker failed ({e}), extracting in this process")
+                            future = None
+                    if future is None:
+                        result = handler.extract_data(file_path)
                     
-                    f.write("[ATTRIBUTES_START]\n")
-                    for attr in attributes:
-                        f.write(f"{attr}\n")
-                    f.write("[ATTRIBUTES_END]\n\n")
+                    if result is None:
+                        failed_count += 1
+                        print(f"  ✗ Status: FAILED (no data found)\n"
+                              f"  📊 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
+                        continue
                     
-                    f.write("[SAMPLE_DATA_START]\n")
-                    for attr in attributes:
-                        value = sample_data.get(attr, 'N/A')
-                        value_str = str(value)
-                        # Use ||| as delimiter for easy parsing
-                        f.write(f"{attr}|||{value_str}\n")
-                    f.write("[SAMPLE_DATA_END]\n")
-                    f.write("[FILE_END]\n")
+                    attributes, sample_data, non_null_count = result
+                    
+                    # Check data completeness
+                    completeness_pct = (non_null_count / len(attributes)) * 100 if attributes else 0
+                    
+                    processed_count += 1
+                    
+                    # Show detailed info in console
+                    print(f"  ✓ Status: SUCCESS\n"
+                          f"  📋 Attributes: {len(attributes)}\n"
+                          f"  📊 Completeness: {completeness_pct:.1f}% ({non_null_count}/{len(attributes)} fields)\n"
+                          f"  📈 Stats: ✓ {processed_count} | ⊘ {skipped_count} | ✗ {failed_count}")
+                    
+                    # Write to individual file (output_file already defined above)
+                    output_file.write_text(
+                        _format_output(filename, file_path, handler_name, completeness_pct,
+                                       attributes, sample_data),
+                        encoding='utf-8')
+                    existing_outputs.add(fold(output_name))
+                    
+                    print(f"  💾 Saved to: {output_file.name}")
+                    
+                    self.processed_filenames.add(filename)
                 
-                print(f"  💾 Saved to: {output_file.name}")
+                print(f"\n{'='*80}")
+                print(f"SUMMARY - {handler_name}")
+                print(f"{'='*80}")
+                print(f"  Total files found:       {total_files}")
+                print(f"  ✓ Successfully processed: {processed_count}")
+                print(f"  ⊘ Skipped (duplicates):   {skipped_count}")
+                print(f"  ✗ Failed (no valid data): {failed_count}")
+                print(f"{'='*80}")
                 
-                self.processed_filenames.add(filename)
+                overall_processed += processed_count
+                overall_skipped += skipped_count
+                overall_failed += failed_count
             
-            print(f"\n{'='*80}")
-            print(f"SUMMARY - {handler_name}")
-            print(f"{'='*80}")
-            print(f"  Total files found:       {total_files}")
-            print(f"  ✓ Successfully processed: {processed_count}")
-            print(f"  ⊘ Skipped (duplicates):   {skipped_count}")
-            print(f"  ✗ Failed (no valid data): {failed_count}")
-            print(f"{'='*80}")
-            
-            overall_processed += processed_count
-            overall_skipped += skipped_count
-            overall_failed += failed_count
-        
         # Print overall summary
         print(f"\n{'='*80}")
         print(f"OVERALL SUMMARY")
@@ -519,48 +871,42 @@ def process_single_file(file_path: str, handlers: List[FileHandler], output_fold
         print("❌ FAILED: No valid data found in file")
         return
     
-    attributes, sample_data = result
+    attributes, sample_data, non_null_count = result
     
     # Check data completeness
-    null_count = sum(1 for v in sample_data.values() if pd.isna(v))
-    completeness_pct = ((len(attributes) - null_count) / len(attributes)) * 100 if attributes else 0
+    completeness_pct = (non_null_count / len(attributes)) * 100 if attributes else 0
     
     print(f"✓ SUCCESS")
     print(f"  📋 Attributes: {len(attributes)}")
-    print(f"  📊 Completeness: {completeness_pct:.1f}% ({len(attributes) - null_count}/{len(attributes)} fields)")
+    print(f"  📊 Completeness: {completeness_pct:.1f}% ({non_null_count}/{len(attributes)} fields)")
     
     # Create output
     output_path = Path(output_folder)
     output_path.mkdir(exist_ok=True)
     
-    file_stem = file_path.stem
-    output_file = output_path / f"{file_stem}_attributes.txt"
+    output_file = output_path / handler.output_filename(file_path)
     
     # Write to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(f"[FILE_START]\n")
-        f.write(f"Filename: {file_path.name}\n")
-        f.write(f"Path: {file_path.absolute()}\n")
-        f.write(f"Type: {handler.__class__.__name__}\n")
-        f.write(f"Completeness: {completeness_pct:.1f}%\n\n")
-        
-        f.write("[ATTRIBUTES_START]\n")
-        for attr in attributes:
-            f.write(f"{attr}\n")
-        f.write("[ATTRIBUTES_END]\n\n")
-        
-        f.write("[SAMPLE_DATA_START]\n")
-        for attr in attributes:
-            value = sample_data.get(attr, 'N/A')
-            value_str = str(value)
-            f.write(f"{attr}|||{value_str}\n")
-        f.write("[SAMPLE_DATA_END]\n")
-        f.write("[FILE_END]\n")
+    output_file.write_text(
+        _format_output(file_path.name, file_path.absolute(), handler.__class__.__name__,
+                       completeness_pct, attributes, sample_data),
+        encoding='utf-8')
     
     print(f"\n💾 Output saved to: {output_file.absolute()}")
     print(f"\n{'='*80}")
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main entry point."""
     # Parse command line arguments
@@ -579,9 +925,17 @@ Examples:
     )
     parser.add_argument('-f', '--file', type=str, help='Process a single file instead of directory scan')
     parser.add_argument('-o', '--output', type=str, default='output', help='Output folder (default: output)')
+    parser.add_argument('-w', '--workers', type=_positive_int, default=None,
+                        help='Number of parallel extraction processes (default: CPU count, 1 = sequential)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Show per-file reader details (file size, delimiter, rows checked)')
     
     args = parser.parse_args()
     
+    # Handler diagnostics go through logging so pool workers don't fight over stdout
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    
     # Initialize handlers
     handlers = [
         ShapefileHandler(),
@@ -616,7 +970,7 @@ Examples:
     
     # Create extractor and process files
     extractor = AttributeExtractor(root_folder, handlers, config_file=config_file)
-    extractor.extract_and_save(output_folder=args.output)
+    extractor.extract_and_save(output_folder=args.output, workers=args.workers)
     
     print("\n✓ Extraction complete!")
     print("Check the 'output' folder for results.")
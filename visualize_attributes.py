@@ -2,15 +2,39 @@
 Visualize attribute relationships and overlaps from extracted data.
 Creates UpSet plots and summary statistics for attribute analysis.
 """
+import io
 import os
+import re
+import sys
+import heapq
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Set
-from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+from collections import Counter
+import matplotlib
+matplotlib.use('Agg')  # Only writes PNGs; also keeps pool workers off GUI backends
 import matplotlib.pyplot as plt
 from upsetplot import from_contents, UpSet
 import pandas as pd
 
 
+# One file block: the Filename line, then everything between the attribute markers.
+# The gap and the body match whole lines that are neither a Filename line nor a
+# marker, so a block without a section (or with an unterminated one) cannot run
+# into the next block.
+_PLAIN_LINE = r'(?![ \t]*(?:Filename:|\[ATTRIBUTES_(?:START|END)\][ \t]*$))[^\n]*\n'
+_FILE_BLOCK = re.compile(
+    r'^[ \t]*Filename:([^\n]*)\n'
+    r'(?:' + _PLAIN_LINE + r')*'
+    r'[ \t]*\[ATTRIBUTES_START\][ \t]*\n'
+    r'((?:' + _PLAIN_LINE + r')*)'
+    r'[ \t]*\[ATTRIBUTES_END\][ \t]*$',
+    re.MULTILINE)
+
+
 def parse_output_file(file_path: Path) -> Dict[str, Set[str]]:
     """
     Parse the structured output file and extract attributes per file.
@@ -18,61 +42,47 @@ def parse_output_file(file_path: Path) -> Dict[str, Set[str]]:
     Returns:
         Dictionary mapping filename to set of attributes
     """
-    file_attributes = {}
-    current_filename = None
-    in_attributes_section = False
-    current_attributes = []
-    
     with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            
-            if line.startswith('Filename:'):
-                current_filename = line.replace('Filename:', '').strip()
-                current_attributes = []
-                
-            elif line == '[ATTRIBUTES_START]':
-                in_attributes_section = True
-                
-            elif line == '[ATTRIBUTES_END]':
-                in_attributes_section = False
-                if current_filename:
-                    file_attributes[current_filename] = set(current_attributes)
-                
-            elif in_attributes_section and line:
-                current_attributes.append(line)
+        text = f.read()
+    
+    # A single regex pass finds every block; lines are stripped and blanks dropped.
+    # Names repeat across blocks, so they are interned: equal attributes share one
+    # string object and later set/dict lookups match by identity
+    file_attributes = {}
+    for match in _FILE_BLOCK.finditer(text):
+        filename = match.group(1).strip()
+        if filename:
+            attributes = {sys.intern(line.strip()) for line in match.group(2).split('\n')}
+            attributes.discard('')
+            file_attributes[sys.intern(filename)] = attributes
     
     return file_attributes
 
 
 def analyze_attributes(file_attributes: Dict[str, Set[str]]) -> Dict:
     """Analyze attribute overlap and generate statistics."""
-    all_attributes = set()
+    # Count how many files have each attribute; the union of all attributes
+    # is the set of counted keys
+    attribute_counts = Counter()
     for attrs in file_attributes.values():
-        all_attributes.update(attrs)
+        attribute_counts.update(attrs)
     
-    # Count how many files have each attribute
-    attribute_counts = defaultdict(int)
-    for attrs in file_attributes.values():
-        for attr in attrs:
-            attribute_counts[attr] += 1
+    all_attributes = attribute_counts.keys()
     
-    # Find common attributes (in all files)
-    common_attributes = set(all_attributes)
-    for attrs in file_attributes.values():
-        common_attributes &= attrs
+    # Find common attributes (in all files): those counted once per file, so no
+    # set intersections are needed
+    total_files = len(file_attributes)
+    common_attributes = {attr for attr, count in attribute_counts.items() if count == total_files}
     
-    # Find unique attributes (in only one file)
-    unique_attributes = {attr: [] for attr in all_attributes}
+    # Find unique attributes (in only one file); each maps to its single file
+    unique_attributes = {}
     for filename, attrs in file_attributes.items():
         for attr in attrs:
             if attribute_counts[attr] == 1:
-                unique_attributes[attr].append(filename)
-    
-    unique_attributes = {k: v for k, v in unique_attributes.items() if v}
+                unique_attributes[attr] = [filename]
     
     return {
-        'total_files': len(file_attributes),
+        'total_files': total_files,
         'total_unique_attributes': len(all_attributes),
         'common_attributes': common_attributes,
         'unique_attributes': unique_attributes,
@@ -86,35 +96,32 @@ def create_upset_plot(file_attributes: Dict[str, Set[str]], output_path: Path, m
     # Limit to max_sets files for readability
     if len(file_attributes) > max_sets:
         print(f"⚠️  Warning: {len(file_attributes)} files found. Showing top {max_sets} with most attributes.")
-        sorted_files = sorted(file_attributes.items(), key=lambda x: len(x[1]), reverse=True)
-        file_attributes = dict(sorted_files[:max_sets])
-    
-    # Create UpSet data structure
-    # Map each attribute to the set of files that contain it
-    attribute_to_files = defaultdict(list)
-    for filename, attrs in file_attributes.items():
-        for attr in attrs:
-            attribute_to_files[attr].append(filename)
+        largest = heapq.nlargest(max_sets, file_attributes, key=lambda name: len(file_attributes[name]))
+        file_attributes = {name: file_attributes[name] for name in largest}
     
     # Create data for UpSet plot
     data = from_contents({filename: attrs for filename, attrs in file_attributes.items()})
     
     # Create the plot
     fig = plt.figure(figsize=(16, 10))
-    upset = UpSet(data, 
-                  subset_size='count',
-                  intersection_plot_elements=10,
-                  show_counts=True,
-                  sort_by='cardinality',
-                  element_size=40)
-    upset.plot(fig=fig)
-    
-    plt.suptitle('Attribute Overlap Analysis Across Files', 
-                fontsize=16, fontweight='bold', y=0.98)
-    
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"  ✓ UpSet plot saved to: {output_path}")
+    try:
+        upset = UpSet(data,
+                      subset_size='count',
+                      intersection_plot_elements=10,
+                      show_counts=True,
+                      sort_by='cardinality',
+                      element_size=40)
+        upset.plot(fig=fig)
+        
+        plt.suptitle('Attribute Overlap Analysis Across Files',
+                    fontsize=16, fontweight='bold', y=0.98)
+        
+        plt.tight_layout()
+        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        print(f"  ✓ UpSet plot saved to: {output_path}")
+    finally:
+        # Figures stay registered with pyplot until closed, even when plotting fails
+        plt.close(fig)
     
     return fig
 
@@ -122,25 +129,28 @@ def create_upset_plot(file_attributes: Dict[str, Set[str]], output_path: Path, m
 def create_frequency_chart(attribute_counts: Dict[str, int], output_path: Path, top_n: int = 30):
     """Create a bar chart showing most common attributes."""
     
-    # Get top N attributes
-    sorted_attrs = sorted(attribute_counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    # Get top N attributes; nlargest matches sorted(..., reverse=True)[:top_n], ties included
+    sorted_attrs = heapq.nlargest(top_n, attribute_counts.items(), key=itemgetter(1))
     attrs, counts = zip(*sorted_attrs) if sorted_attrs else ([], [])
     
     fig, ax = plt.subplots(figsize=(12, 8))
-    bars = ax.barh(range(len(attrs)), counts, color='steelblue')
-    ax.set_yticks(range(len(attrs)))
-    ax.set_yticklabels(attrs)
-    ax.set_xlabel('Number of Files Containing Attribute', fontsize=12)
-    ax.set_title(f'Top {top_n} Most Common Attributes', fontsize=14, fontweight='bold')
-    ax.invert_yaxis()
-    
-    # Add value labels
-    for i, (bar, count) in enumerate(zip(bars, counts)):
-        ax.text(count + 0.1, i, str(count), va='center', fontsize=10)
-    
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"  ✓ Frequency chart saved to: {output_path}")
+    try:
+        bars = ax.barh(range(len(attrs)), counts, color='steelblue')
+        ax.set_yticks(range(len(attrs)))
+        ax.set_yticklabels(attrs)
+        ax.set_xlabel('Number of Files Containing Attribute', fontsize=12)
+        ax.set_title(f'Top {top_n} Most Common Attributes', fontsize=14, fontweight='bold')
+        ax.invert_yaxis()
+        
+        # Add value labels
+        for i, (bar, count) in enumerate(zip(bars, counts)):
+            ax.text(count + 0.1, i, str(count), va='center', fontsize=10)
+        
+        plt.tight_layout()
+        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        print(f"  ✓ Frequency chart saved to: {output_path}")
+    finally:
+        plt.close(fig)
     
     return fig
 
@@ -148,54 +158,131 @@ def create_frequency_chart(attribute_counts: Dict[str, int], output_path: Path,
 def generate_summary_report(analysis: Dict, output_path: Path):
     """Generate a text summary report of the analysis."""
     
+    rule = "=" * 80 + "\n"
+    
+    # Build the whole report in memory and write it in one call
+    parts = [
+        rule,
+        "ATTRIBUTE OVERLAP ANALYSIS SUMMARY\n",
+        rule + "\n",
+        f"Total Files Analyzed: {analysis['total_files']}\n",
+        f"Total Unique Attributes: {analysis['total_unique_attributes']}\n",
+        f"Common Attributes (in ALL files): {len(analysis['common_attributes'])}\n",
+        f"Unique Attributes (in ONE file only): {len(analysis['unique_attributes'])}\n\n",
+    ]
+    
+    if analysis['common_attributes']:
+        parts.append(rule + "COMMON ATTRIBUTES (Present in ALL files)\n" + rule)
+        parts.extend(f"  • {attr}\n" for attr in sorted(analysis['common_attributes']))
+        parts.append("\n")
+    else:
+        parts.append("No attributes are common to all files.\n\n")
+    
+    if analysis['unique_attributes']:
+        parts.append(rule + "UNIQUE ATTRIBUTES (Present in only ONE file)\n" + rule)
+        for attr, files in sorted(analysis['unique_attributes'].items()):
+            parts.append(f"  • {attr}\n")
+            parts.extend(f"      └─ {filename}\n" for filename in files)
+        parts.append("\n")
+    
+    parts.append(rule + "ATTRIBUTE FREQUENCY DISTRIBUTION\n" + rule)
+    sorted_counts = sorted(analysis['attribute_counts'].items(), 
+                          key=itemgetter(1), reverse=True)
+    
+    parts.append(f"{'Attribute':<50} {'Files':<10} {'Percentage':<10}\n")
+    parts.append("-" * 80 + "\n")
+    
+    total_files = analysis['total_files']
+    for attr, count in sorted_counts:
+        percentage = (count / total_files) * 100
+        attr_truncated = attr[:47] + "..." if len(attr) > 50 else attr
+        parts.append(f"{attr_truncated:<50} {count:<10} {percentage:.1f}%\n")
+    
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("=" * 80 + "\n")
-        f.write("ATTRIBUTE OVERLAP ANALYSIS SUMMARY\n")
-        f.write("=" * 80 + "\n\n")
-        
-        f.write(f"Total Files Analyzed: {analysis['total_files']}\n")
-        f.write(f"Total Unique Attributes: {analysis['total_unique_attributes']}\n")
-        f.write(f"Common Attributes (in ALL files): {len(analysis['common_attributes'])}\n")
-        f.write(f"Unique Attributes (in ONE file only): {len(analysis['unique_attributes'])}\n\n")
-        
-        if analysis['common_attributes']:
-            f.write("=" * 80 + "\n")
-            f.write("COMMON ATTRIBUTES (Present in ALL files)\n")
-            f.write("=" * 80 + "\n")
-            for attr in sorted(analysis['common_attributes']):
-                f.write(f"  • {attr}\n")
-            f.write("\n")
-        else:
-            f.write("No attributes are common to all files.\n\n")
-        
-        if analysis['unique_attributes']:
-            f.write("=" * 80 + "\n")
-            f.write("UNIQUE ATTRIBUTES (Present in only ONE file)\n")
-            f.write("=" * 80 + "\n")
-            for attr, files in sorted(analysis['unique_attributes'].items()):
-                f.write(f"  • {attr}\n")
-                for filename in files:
-                    f.write(f"      └─ {filename}\n")
-            f.write("\n")
-        
-        f.write("=" * 80 + "\n")
-        f.write("ATTRIBUTE FREQUENCY DISTRIBUTION\n")
-        f.write("=" * 80 + "\n")
-        sorted_counts = sorted(analysis['attribute_counts'].items(), 
-                              key=lambda x: x[1], reverse=True)
-        
-        f.write(f"{'Attribute':<50} {'Files':<10} {'Percentage':<10}\n")
-        f.write("-" * 80 + "\n")
-        
-        total_files = analysis['total_files']
-        for attr, count in sorted_counts:
-            percentage = (count / total_files) * 100
-            attr_truncated = attr[:47] + "..." if len(attr) > 50 else attr
-            f.write(f"{attr_truncated:<50} {count:<10} {percentage:.1f}%\n")
+        f.write(''.join(parts))
     
     print(f"  ✓ Summary report saved to: {output_path}")
 
 
+def process_attribute_file(txt_file: Path, viz_output: Path):
+    """Parse, analyze and plot one *_attributes.txt file."""
+    file_type = txt_file.stem.replace('_attributes', '')
+    print(f"\n{'='*80}")
+    print(f"Processing: {txt_file.name} ({file_type.upper()})")
+    print(f"{'='*80}")
+    
+    # Parse the file
+    print("  📖 Parsing attribute data...")
+    file_attributes = parse_output_file(txt_file)
+    
+    if not file_attributes:
+        print("  ⚠️  No data found in file")
+        return
+    
+    print(f"  ✓ Found {len(file_attributes)} files with attributes")
+    
+    # Analyze
+    print("  🔍 Analyzing attribute overlaps...")
+    analysis = analyze_attributes(file_attributes)
+    
+    # Generate visualizations
+    print("  📊 Generating visualizations...")
+    
+    # 1. UpSet plot
+    try:
+        upset_path = viz_output / f"{file_type}_upset_plot.png"
+        create_upset_plot(file_attributes, upset_path)
+    except Exception as e:
+        print(f"  ⚠️  Could not create UpSet plot: {e}")
+    
+    # 2. Frequency chart
+    try:
+        freq_path = viz_output / f"{file_type}_frequency.png"
+        create_frequency_chart(analysis['attribute_counts'], freq_path)
+    except Exception as e:
+        print(f"  ⚠️  Could not create frequency chart: {e}")
+    
+    # 3. Summary report
+    summary_path = viz_output / f"{file_type}_summary.txt"
+    generate_summary_report(analysis, summary_path)
+    
+    print(f"\n  📈 Summary Statistics:")
+    print(f"    Total files:                {analysis['total_files']}")
+    print(f"    Unique attributes:          {analysis['total_unique_attributes']}")
+    print(f"    Common to all:              {len(analysis['common_attributes'])}")
+    print(f"    Unique to one file:         {len(analysis['unique_attributes'])}")
+
+
+def _process_safely(txt_file: Path, viz_output: Path) -> bool:
+    """
+    Run process_attribute_file, reporting an error instead of raising it.
+    
+    The traceback goes to stderr so the other files still run.
+    
+    Returns:
+        True if the file failed
+    """
+    try:
+        process_attribute_file(txt_file, viz_output)
+        return False
+    except Exception:
+        print(f"  ❌ Error processing {txt_file.name}")
+        traceback.print_exc()
+        return True
+
+
+def _process_captured(txt_file: Path, viz_output: Path) -> Tuple[str, bool]:
+    """
+    Run _process_safely in a worker and return (console_output, failed).
+    
+    Output is captured so the parent can print each file's progress in order.
+    """
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        failed = _process_safely(txt_file, viz_output)
+    return buffer.getvalue(), failed
+
+
 def main():
     """Main entry point."""
     print("\n" + "=" * 80)
@@ -226,58 +313,33 @@ def main():
     viz_output = output_path / "visualizations"
     viz_output.mkdir(exist_ok=True)
     
-    # Process each file type
-    for txt_file in txt_files:
-        file_type = txt_file.stem.replace('_attributes', '')
-        print(f"\n{'='*80}")
-        print(f"Processing: {txt_file.name} ({file_type.upper()})")
-        print(f"{'='*80}")
-        
-        # Parse the file
-        print("  📖 Parsing attribute data...")
-        file_attributes = parse_output_file(txt_file)
-        
-        if not file_attributes:
-            print("  ⚠️  No data found in file")
-            continue
-        
-        print(f"  ✓ Found {len(file_attributes)} files with attributes")
-        
-        # Analyze
-        print("  🔍 Analyzing attribute overlaps...")
-        analysis = analyze_attributes(file_attributes)
-        
-        # Generate visualizations
-        print("  📊 Generating visualizations...")
-        
-        # 1. UpSet plot
-        try:
-            upset_path = viz_output / f"{file_type}_upset_plot.png"
-            create_upset_plot(file_attributes, upset_path)
-        except Exception as e:
-            print(f"  ⚠️  Could not create UpSet plot: {e}")
-        
-        # 2. Frequency chart
-        try:
-            freq_path = viz_output / f"{file_type}_frequency.png"
-            create_frequency_chart(analysis['attribute_counts'], freq_path)
-        except Exception as e:
-            print(f"  ⚠️  Could not create frequency chart: {e}")
-        
-        # 3. Summary report
-        summary_path = viz_output / f"{file_type}_summary.txt"
-        generate_summary_report(analysis, summary_path)
-        
-        print(f"\n  📈 Summary Statistics:")
-        print(f"    Total files:                {analysis['total_files']}")
-        print(f"    Unique attributes:          {analysis['total_unique_attributes']}")
-        print(f"    Common to all:              {len(analysis['common_attributes'])}")
-        print(f"    Unique to one file:         {len(analysis['unique_attributes'])}")
+    # Each file type is independent, so several are processed in parallel; their
+    # console output is collected and printed in order once each one finishes.
+    # With one file or one CPU they run in this process and print as they go.
+    failed_files = []
+    workers = min(len(txt_files), os.cpu_count() or 1)
+    if workers == 1:
+        failed_files = [txt_file for txt_file in txt_files if _process_safely(txt_file, viz_output)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_process_captured, txt_files, [viz_output] * len(txt_files))
+            for txt_file, (output, failed) in zip(txt_files, results):
+                print(output, end='')
+                if failed:
+                    failed_files.append(txt_file)
     
     print("\n" + "=" * 80)
-    print("✓ VISUALIZATION COMPLETE!")
+    if failed_files:
+        print(f"❌ VISUALIZATION FINISHED WITH ERRORS: {len(failed_files)} of {len(txt_files)} file(s) failed")
+        for txt_file in failed_files:
+            print(f"  • {txt_file.name}")
+    else:
+        print("✓ VISUALIZATION COMPLETE!")
     print(f"📁 Check the '{viz_output}' folder for results")
     print("=" * 80 + "\n")
+    
+    if failed_files:
+        sys.exit(1)
 
 
 if __name__ == "__main__":